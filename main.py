@@ -1,156 +1,370 @@
 # main.py - RPD Telegram Alert Bot (Render - Final Operational Version v3)
-import telegram
-import time
-import yfinance as yf
-import pandas as pd
-import pandas_ta as ta
+import asyncio
+import aiohttp
+import numpy as np
 import logging
 import os
-import requests
-import ccxt
-from flask import Flask
-from threading import Thread
-
-# --- Web Server for UptimeRobot ---
-app = Flask('')
-@app.route('/')
-def home():
-    return "RPD Alert Bot is alive and running."
-def run_flask():
-  app.run(host='0.0.0.0', port=10000)
-def keep_alive():
-    t = Thread(target=run_flask)
-    t.start()
+import sqlite3
+import time
+import importlib
+from aiohttp import web
+from dataclasses import dataclass, field
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the kernels below still run as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]): return args[0]
+        return lambda func: func
+
+# --- Web Server for UptimeRobot (shares the bot's event loop) ---
+async def home(request):
+    return web.Response(text="RPD Alert Bot is alive and running.")
+async def keep_alive():
+    app = web.Application()
+    app.router.add_get('/', home)
+    runner = web.AppRunner(app, access_log=None)  # no log line per UptimeRobot ping
+    await runner.setup()
+    await web.TCPSite(runner, '0.0.0.0', 10000).start()
 
 # --- Configuration ---
+def timeframe_seconds(timeframe):
+    # '15m' -> 900, using ccxt's timeframe units without importing ccxt.
+    return int(timeframe[:-1]) * {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}[timeframe[-1]]
+
 TELEGRAM_BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN')
 TELEGRAM_CHAT_ID = os.environ.get('TELEGRAM_CHAT_ID')
-ASSET_CONFIG = {
-    'MICROSOFT': {
-        'ticker': 'MSFT', 'source': 'yfinance', 'timeframe': '15m',
-        'fractalStrength': 2, 'rsiLen': 17, 'rsiTop': 65, 'rsiBot': 40
-    },
-    'BITCOIN': {
-        'ticker': 'BTC/USDT', 'source': 'ccxt', 'timeframe': '1h',
-        'fractalStrength': 2, 'rsiLen': 14, 'rsiTop': 70, 'rsiBot': 30
-    },
-}
+
+@dataclass(frozen=True, slots=True)
+class AssetConfig:
+    name: str
+    ticker: str
+    source: str
+    timeframe: str
+    fractal_strength: int
+    rsi_len: int
+    rsi_top: float
+    rsi_bot: float
+    candle_pos: int = field(init=False)  # the newest bar with `fractal_strength` bars on both sides
+
+    def __post_init__(self):
+        object.__setattr__(self, 'candle_pos', -(self.fractal_strength + 1))
+
+ASSETS = [
+    AssetConfig(name='MICROSOFT', ticker='MSFT', source='yahoo', timeframe='15m',
+                fractal_strength=2, rsi_len=17, rsi_top=65, rsi_bot=40),
+    AssetConfig(name='BITCOIN', ticker='BTC/USDT', source='ccxt', timeframe='1h',
+                fractal_strength=2, rsi_len=14, rsi_top=70, rsi_bot=30),
+]
    
 # --- Initialization ---
-bot = telegram.Bot(token=TELEGRAM_BOT_TOKEN)
 logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
-last_signal_timestamp = {asset: None for asset in ASSET_CONFIG}
-session = requests.Session()
-session.headers.update({'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'})
-# --- Use a more lenient exchange ---
-exchange = ccxt.gateio()
+# Bar times are kept as int epoch seconds throughout; they are only turned into dates for logging.
+last_signal_timestamp = {asset.name: None for asset in ASSETS}
+# Newest bar seen per asset. Until a new bar opens, the candle at candle_pos and its closed neighbours are unchanged,
+# and the forming bar's high/low can only widen, so a repeat check could never turn up a new signal.
+last_processed_timestamp = {asset.name: None for asset in ASSETS}
+# Wilder RSI averages per asset as of the last checked candle: (candle timestamp, avg_gain, avg_loss).
+rsi_state = {}
+TELEGRAM_SEND_URL = f'https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage'
+YAHOO_CHART_URL = 'https://query1.finance.yahoo.com/v8/finance/chart/{ticker}'
+YAHOO_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+# One keep-alive connection pool for Telegram, Yahoo and ccxt, opened in main() and kept for the life of the process.
+http = None
+# --- Use a more lenient exchange (ccxt paces its own requests); built on the shared pool in main() ---
+exchange = None
+# Recent bars per (ticker, timeframe), kept across cycles (and restarts, via STATE_DB) so fetches only pull what is new.
+HISTORY_BARS = 200
+bar_history = {}
+STATE_DB = os.environ.get('STATE_DB', 'state.db')
+state_db = None
+
+# --- State persistence ---
+def load_state():
+    global state_db
+    state_db = sqlite3.connect(STATE_DB)
+    state_db.executescript("""
+        CREATE TABLE IF NOT EXISTS signals (asset TEXT PRIMARY KEY, ts INTEGER);
+        CREATE TABLE IF NOT EXISTS bars (ticker TEXT, timeframe TEXT, ts INTEGER, high REAL, low REAL, close REAL, PRIMARY KEY (ticker, timeframe, ts));
+    """)
+    for asset_name, ts in state_db.execute("SELECT asset, ts FROM signals"):
+        if asset_name in last_signal_timestamp: last_signal_timestamp[asset_name] = ts
+    for asset in ASSETS:
+        rows = state_db.execute("SELECT ts, high, low, close FROM bars WHERE ticker = ? AND timeframe = ? ORDER BY ts",
+                                (asset.ticker, asset.timeframe)).fetchall()
+        if not rows: continue
+        data = np.asarray(rows, dtype=np.float64)
+        bars = (data[:, 0].astype(np.int64), *(np.ascontiguousarray(data[:, k]) for k in (1, 2, 3)))
+        for a in bars: a.flags.writeable = False
+        bar_history[asset.ticker, asset.timeframe] = bars
+    logging.info("Loaded state from %s (%d cached bar histories).", STATE_DB, len(bar_history))
+
+def save_signal(asset_name, ts):
+    with state_db:
+        state_db.execute("INSERT OR REPLACE INTO signals VALUES (?, ?)", (asset_name, ts))
 
-def send_telegram_alert(message):
+def save_bars(ticker, timeframe, new_bars, oldest_ts, replace):
+    ts, highs, lows, closes = new_bars
+    with state_db:
+        if replace: state_db.execute("DELETE FROM bars WHERE ticker = ? AND timeframe = ?", (ticker, timeframe))
+        else: state_db.execute("DELETE FROM bars WHERE ticker = ? AND timeframe = ? AND ts < ?", (ticker, timeframe, int(oldest_ts)))
+        state_db.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?)",
+                             zip([ticker] * len(ts), [timeframe] * len(ts), ts.tolist(), highs.tolist(), lows.tolist(), closes.tolist()))
+
+def history_since(ticker, timeframe):
+    # Start of the newest stored bar (it may still have been forming), or None when a full pull is needed.
+    history = bar_history.get((ticker, timeframe))
+    if history is None or not len(history[0]): return None
+    last_ts = int(history[0][-1])
+    if time.time() - last_ts > HISTORY_BARS * timeframe_seconds(timeframe): return None
+    return last_ts
+
+def update_bar_history(ticker, timeframe, new_bars, incremental):
+    if incremental:
+        history = bar_history[ticker, timeframe]
+        keep = history[0] < new_bars[0][0] if len(new_bars[0]) else slice(None)
+        bars = tuple(np.concatenate([old[keep], new]) for old, new in zip(history, new_bars))
+    else:
+        bars = new_bars
+    # Contiguous copies keep the kernels on a single compiled specialization whichever path built the bars.
+    bars = tuple(np.ascontiguousarray(a[-HISTORY_BARS:]) for a in bars)
+    # The signal code reads these arrays without copying them, so keep the stored history read-only.
+    for a in bars: a.flags.writeable = False
+    bar_history[ticker, timeframe] = bars
+    if len(bars[0]): save_bars(ticker, timeframe, new_bars, bars[0][0], replace=not incremental)
+    return bars if len(bars[0]) else None
+
+async def send_telegram_alert(message):
     try:
-        bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message, parse_mode='Markdown')
+        async with http.post(TELEGRAM_SEND_URL, json={'chat_id': TELEGRAM_CHAT_ID, 'text': message, 'parse_mode': 'Markdown'}) as r:
+            body = await r.json()
+        if not body.get('ok'): raise RuntimeError(body.get('description'))
         logging.info("Telegram alert sent!")
     except Exception as e:
-        logging.error(f"Failed to send Telegram alert: {e}")
+        logging.error("Failed to send Telegram alert: %s", e)
+
+async def get_json(url, retries=3, backoff=0.3, **kwargs):
+    # GET on the shared pool, retrying connection errors, timeouts, 429 and 5xx with exponential backoff.
+    for attempt in range(retries + 1):
+        try:
+            async with http.get(url, **kwargs) as r:
+                r.raise_for_status()
+                return await r.json()
+        except aiohttp.ClientResponseError as e:
+            if attempt == retries or (e.status != 429 and e.status < 500): raise
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt == retries: raise
+        await asyncio.sleep(backoff * 2 ** attempt)
 
-def get_yfinance_data(ticker, timeframe, session):
+def finite_bars(ts, highs, lows, closes):
+    # Validate once at ingest: rows with a missing price are dropped here, so the kernels never need NaN checks.
+    valid = np.isfinite(highs) & np.isfinite(lows) & np.isfinite(closes)
+    if valid.all(): return ts, highs, lows, closes
+    return ts[valid], highs[valid], lows[valid], closes[valid]
+
+async def get_yahoo_chart(ticker, interval, range_='7d'):
+    # Hit the chart endpoint directly; only timestamps and high/low/close are needed, so skip yfinance's parsing.
     try:
-        tkr = yf.Ticker(ticker, session=session)
-        data = tkr.history(period="7d", interval=timeframe, auto_adjust=True)
-        if data.empty: return pd.DataFrame()
-        data.rename(columns={"Open": "open", "High": "high", "Low": "low", "Close": "close", "Volume": "volume"}, inplace=True)
-        return data.dropna()
+        since = history_since(ticker, interval)
+        params = {'interval': interval, 'range': range_} if since is None else {'interval': interval, 'period1': since, 'period2': int(time.time())}
+        j = (await get_json(YAHOO_CHART_URL.format(ticker=ticker), params=params, headers=YAHOO_HEADERS))['chart']['result'][0]
+        if not j.get('timestamp'): return bar_history.get((ticker, interval)) if since is not None else None
+        quote = j['indicators']['quote'][0]
+        ts = np.asarray(j['timestamp'], dtype=np.int64)
+        highs = np.asarray(quote['high'], dtype=np.float64)
+        lows = np.asarray(quote['low'], dtype=np.float64)
+        closes = np.asarray(quote['close'], dtype=np.float64)
+        ts, highs, lows, closes = finite_bars(ts, highs, lows, closes)
+        # While the market is open Yahoo can return the live price as its own row inside the last bar; merge it in.
+        if len(ts) > 1 and ts[-1] - ts[-2] < timeframe_seconds(interval):
+            highs[-2] = max(highs[-2], highs[-1]); lows[-2] = min(lows[-2], lows[-1]); closes[-2] = closes[-1]
+            ts, highs, lows, closes = ts[:-1], highs[:-1], lows[:-1], closes[:-1]
+        return update_bar_history(ticker, interval, (ts, highs, lows, closes), incremental=since is not None)
     except Exception as e:
-        logging.error(f"Error fetching yfinance data for {ticker}: {e}")
-        return pd.DataFrame()
+        logging.error("Error fetching Yahoo chart data for %s: %s", ticker, e)
+        return None
 
-def get_ccxt_data(ticker, timeframe):
+async def get_ccxt_data(ticker, timeframe):
     try:
-        ohlcv = exchange.fetch_ohlcv(ticker, timeframe, limit=200)
-        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.set_index('timestamp', inplace=True)
-        return df
+        since = history_since(ticker, timeframe)
+        ohlcv = await exchange.fetch_ohlcv(ticker, timeframe, since=None if since is None else since * 1000, limit=HISTORY_BARS)
+        ohlcv = np.asarray(ohlcv, dtype=np.float64).reshape(-1, 6)
+        bars = finite_bars(ohlcv[:, 0].astype(np.int64) // 1000, ohlcv[:, 2], ohlcv[:, 3], ohlcv[:, 4])
+        return update_bar_history(ticker, timeframe, bars, incremental=since is not None)
     except Exception as e:
-        logging.error(f"Error fetching ccxt data for {ticker}: {e}")
-        return pd.DataFrame()
+        logging.error("Error fetching ccxt data for %s: %s", ticker, e)
+        return None
 
-def calculate_rpd_signals(df, config):
-    if df.empty or len(df) < 50: return None, 0, None
-    
-    rsi_col = f"RSI_{config['rsiLen']}"
-    df[rsi_col] = ta.rsi(df['close'], length=config['rsiLen'])
+@njit(cache=True)
+def _rsi_seed(close, length):
+    # Wilder's starting point: the SMA of the first `length` gains and losses, valid at bar `length`.
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, length + 1):
+        diff = close[i] - close[i - 1]
+        if diff > 0: avg_gain += diff
+        else: avg_loss -= diff
+    return avg_gain / length, avg_loss / length
+
+@njit(cache=True)
+def _rsi_fold(close, start, end, length, avg_gain, avg_loss):
+    # Advance Wilder's averages from bar `start` to bar `end`.
+    for i in range(start + 1, end + 1):
+        diff = close[i] - close[i - 1]
+        gain = diff if diff > 0 else 0.0
+        loss = -diff if diff < 0 else 0.0
+        avg_gain = (avg_gain * (length - 1) + gain) / length
+        avg_loss = (avg_loss * (length - 1) + loss) / length
+    return avg_gain, avg_loss
+
+@njit(cache=True)
+def _rpd_signal_at(high, low, close, n, rsi_len, rsi_top, rsi_bot, state_idx, avg_gain, avg_loss):
+    # Fused fractal + RSI threshold test of the candle n+1 bars from the end: 1 = peak, -1 = valley, 0 = none.
+    # Wilder's averages resume from bar `state_idx` (or are seeded afresh when it is negative); they are returned
+    # as of the candle so the next call only folds the bars that arrived since.
+    i = len(close) - n - 1
+    if state_idx < 0:
+        if i < rsi_len: return 0, np.nan, np.nan
+        avg_gain, avg_loss = _rsi_seed(close, rsi_len)
+        state_idx = rsi_len
+    avg_gain, avg_loss = _rsi_fold(close, state_idx, i, rsi_len, avg_gain, avg_loss)
+    rsi_value = 100.0 * avg_gain / (avg_gain + avg_loss) if avg_gain + avg_loss > 0.0 else np.nan
+    is_high = True
+    is_low = True
+    for j in range(i - n, i + n + 1):
+        if high[j] > high[i]: is_high = False
+        if low[j] < low[i]: is_low = False
+    if is_high and rsi_value > rsi_top: return 1, avg_gain, avg_loss
+    if is_low and rsi_value < rsi_bot: return -1, avg_gain, avg_loss
+    return 0, avg_gain, avg_loss
+
+def warm_up_kernels():
+    # Compile the kernels for the exact argument types the cycle passes (read-only contiguous float64 history plus
+    # each asset's parameters) so the first check doesn't pay for JIT. With cache=True the machine code is also
+    # written to __pycache__, so running this once at build time ships it precompiled.
+    dummy = np.linspace(1.0, 2.0, 64)
+    dummy.flags.writeable = False
+    for asset in ASSETS:
+        _rpd_signal_at(dummy, dummy, dummy, asset.fractal_strength, asset.rsi_len, asset.rsi_top, asset.rsi_bot, -1, 0.0, 0.0)
+
+def calculate_rpd_signals(highs, lows, closes, timestamps, asset):
+    if len(closes) < 50: return None, 0, None
     
-    n = config['fractalStrength']
-    win = 2 * n + 1
-    df['is_fractal_high'] = df['high'] == df['high'].rolling(win, center=True).max()
-    df['is_fractal_low'] = df['low'] == df['low'].rolling(win, center=True).min()
+    # Resume RSI from the candle checked last time if it is still in the window, so only new bars are folded in.
+    state_idx, avg_gain, avg_loss = -1, 0.0, 0.0
+    state = rsi_state.get(asset.name)
+    if state is not None:
+        k = int(np.searchsorted(timestamps, state[0]))
+        if k <= len(timestamps) + asset.candle_pos and timestamps[k] == state[0]: state_idx, avg_gain, avg_loss = k, state[1], state[2]
+    signal_code, avg_gain, avg_loss = _rpd_signal_at(highs, lows, closes, asset.fractal_strength, asset.rsi_len,
+                                                     asset.rsi_top, asset.rsi_bot, state_idx, avg_gain, avg_loss)
+    if not np.isnan(avg_gain): rsi_state[asset.name] = (int(timestamps[asset.candle_pos]), avg_gain, avg_loss)
+    if not signal_code: return None, 0, None
     
+    probability = 85.0
+    candle = (int(timestamps[asset.candle_pos]), closes[asset.candle_pos])
+    return ('peak' if signal_code > 0 else 'valley'), probability, candle
+
+def current_bar_open(timeframe):
+    seconds = timeframe_seconds(timeframe)
+    now = int(time.time())
+    return now - now % seconds
+
+def seconds_until_next_close():
+    # Wake 2s after the earliest upcoming bar close over all timeframes. Never sleep longer than the old
+    # 5-minute cadence, so a bar the source was slow to publish is picked up on a later pass.
+    next_close = min(current_bar_open(tf) + timeframe_seconds(tf) for tf in {asset.timeframe for asset in ASSETS})
+    return min(300, max(5, next_close + 2 - time.time()))
+
+async def fetch_asset_data(asset):
+    if asset.source == 'yahoo':
+        return await get_yahoo_chart(asset.ticker, asset.timeframe)
+    elif asset.source == 'ccxt':
+        return await get_ccxt_data(asset.ticker, asset.timeframe)
+    return None
+
+async def handle_asset(asset, fetch):
+    # Returns the alert text for a new signal, or None; check_assets sends the cycle's alerts together.
+    asset_name = asset.name
+    logging.info("--- Checking %s (%s) on %s ---", asset_name, asset.ticker, asset.timeframe)
     try:
-        candle_pos = -(n + 1)
-        rsi_value = df[rsi_col].iloc[candle_pos]
-        is_high = df['is_fractal_high'].iloc[candle_pos]
-        is_low = df['is_fractal_low'].iloc[candle_pos]
-        candle_data = df.iloc[candle_pos]
+        bars = await fetch
+
+        if bars is None:
+            logging.warning("Skipping check for %s due to no data.", asset_name); return
         
-        if pd.isna(rsi_value): return None, 0, None
-    except IndexError:
-        return None, 0, None
+        timestamps, highs, lows, closes = bars
+        if timestamps[-1] == last_processed_timestamp.get(asset_name):
+            logging.info("No new bar for %s since the last check.", asset_name); return
+        signal_type, prob, candle = calculate_rpd_signals(highs, lows, closes, timestamps, asset)
+        last_processed_timestamp[asset_name] = int(timestamps[-1])
+        
+        if signal_type:
+            signal_timestamp, price = candle
+            if signal_timestamp != last_signal_timestamp.get(asset_name):
+                last_signal_timestamp[asset_name] = signal_timestamp
+                save_signal(asset_name, signal_timestamp)
+                emoji = "🔴" if signal_type == 'peak' else "🟢"
+                signal_text = "PEAK REVERSAL (SHORT)" if signal_type == 'peak' else "VALLEY REVERSAL (LONG)"
+                message = (f"{emoji} *RPD Signal Detected* {emoji}\n\n"
+                           f"*Asset:* {asset_name} ({asset.ticker})\n*Timeframe:* {asset.timeframe}\n"
+                           f"*Signal:* {signal_text}\n*Price:* `{price:.4f}`\n"
+                           f"*Probability:* `{prob:.2f}%` (Simplified)")
+                return message
+            else:
+                logging.info("Signal for %s on %s already sent.", asset_name, np.datetime64(signal_timestamp, 's'))
+        else: 
+            logging.info("No new signal for %s.", asset_name)
+    except Exception as e: 
+        logging.error("An error occurred in check_assets for %s: %s", asset_name, e)
 
-    is_peak_condition = is_high and rsi_value > config['rsiTop']
-    is_valley_condition = is_low and rsi_value < config['rsiBot']
-    
-    probability = 85.0
-    
-    if is_peak_condition: return 'peak', probability, candle_data
-    elif is_valley_condition: return 'valley', probability, candle_data
-    else: return None, 0, None
-
-def check_assets():
-    for asset_name, config in ASSET_CONFIG.items():
-        logging.info(f"--- Checking {asset_name} ({config['ticker']}) on {config['timeframe']} ---")
-        df = pd.DataFrame()
-        try:
-            if config['source'] == 'yfinance':
-                df = get_yfinance_data(config['ticker'], config['timeframe'], session)
-            elif config['source'] == 'ccxt':
-                df = get_ccxt_data(config['ticker'], config['timeframe'])
-
-            if df.empty:
-                logging.warning(f"Skipping check for {asset_name} due to no data."); continue
-            
-            signal_type, prob, candle_data = calculate_rpd_signals(df.copy(), config)
-            
-            if signal_type:
-                signal_timestamp = candle_data.name
-                if signal_timestamp != last_signal_timestamp.get(asset_name):
-                    last_signal_timestamp[asset_name] = signal_timestamp
-                    emoji = "🔴" if signal_type == 'peak' else "🟢"
-                    signal_text = "PEAK REVERSAL (SHORT)" if signal_type == 'peak' else "VALLEY REVERSAL (LONG)"
-                    price = candle_data['close']
-                    message = (f"{emoji} *RPD Signal Detected* {emoji}\n\n"
-                               f"*Asset:* {asset_name} ({config['ticker']})\n*Timeframe:* {config['timeframe']}\n"
-                               f"*Signal:* {signal_text}\n*Price:* `{price:.4f}`\n"
-                               f"*Probability:* `{prob:.2f}%` (Simplified)")
-                    send_telegram_alert(message)
-                else:
-                    logging.info(f"Signal for {asset_name} on {signal_timestamp} already sent.")
-            else: 
-                logging.info(f"No new signal for {asset_name}.")
-        except Exception as e: 
-            logging.error(f"An error occurred in check_assets for {asset_name}: {e}")
-        time.sleep(3)
+async def check_assets():
+    # Yahoo's chart endpoint takes one symbol per request, so the most we can batch is one fetch per
+    # (source, ticker, timeframe), shared by every asset that watches the same series.
+    fetches = {}
+    due = []
+    for asset in ASSETS:
+        # Still inside the bar we last processed: nothing can have changed (see last_processed_timestamp), so skip the download.
+        if last_processed_timestamp[asset.name] == current_bar_open(asset.timeframe):
+            logging.info("Skipping %s: its %s bar has not closed yet.", asset.name, asset.timeframe); continue
+        due.append(asset)
+        key = (asset.source, asset.ticker, asset.timeframe)
+        if key not in fetches: fetches[key] = asyncio.ensure_future(fetch_asset_data(asset))
+    messages = await asyncio.gather(*(handle_asset(asset, fetches[asset.source, asset.ticker, asset.timeframe]) for asset in due))
+    pending_alerts = [message for message in messages if message]
+    if pending_alerts:
+        await send_telegram_alert('\n\n---\n\n'.join(pending_alerts))
 
-if __name__ == '__main__':
-    keep_alive()
-    send_telegram_alert("✅ RPD Alert Bot is now LIVE and fully operational!")
+async def alert_loop():
+    await asyncio.to_thread(warm_up_kernels)
+    await send_telegram_alert("✅ RPD Alert Bot is now LIVE and fully operational!")
     while True:
         try:
-            check_assets()
-            logging.info("Cycle complete. Waiting for 5 minutes...")
-            time.sleep(300)
-        except KeyboardInterrupt: 
-            print("Bot stopped by user."); break
+            await check_assets()
+            delay = seconds_until_next_close()
+            logging.info("Cycle complete. Waiting %.0fs for the next bar close...", delay)
+            await asyncio.sleep(delay)
         except Exception as e:
-            logging.critical(f"A critical error occurred in the main loop: {e}")
-            send_telegram_alert(f"🚨 BOT ERROR: {e}. Restarting in 60s.")
-            time.sleep(60)
+            logging.critical("A critical error occurred in the main loop: %s", e)
+            await send_telegram_alert(f"🚨 BOT ERROR: {e}. Restarting in 60s.")
+            await asyncio.sleep(60)
+
+async def main():
+    global http, exchange
+    await keep_alive()  # answer health checks before the slow startup work below
+    # ccxt imports every exchange module up front (seconds on a small instance), so load it off the loop.
+    ccxt = await asyncio.to_thread(importlib.import_module, 'ccxt.async_support')
+    load_state()
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10), connector=aiohttp.TCPConnector(limit_per_host=10, ttl_dns_cache=300)) as http:
+        exchange = ccxt.gateio({'enableRateLimit': True, 'session': http})
+        try:
+            await alert_loop()
+        finally:
+            await exchange.close()
+            state_db.close()
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt: 
+        print("Bot stopped by user.")